@@ -1,17 +1,18 @@
 # Install required libraries
-!pip install requests pandas pandera tenacity --quiet faker
+!pip install requests pandera[polars] polars numpy orjson --quiet faker
 
+import orjson
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+import numpy as np
+import polars as pl
 import logging
 from datetime import datetime
 import os
-from tenacity import retry, stop_after_attempt, wait_exponential
-import pandera as pa
-from pandera import Check, Column, DataFrameSchema
-from concurrent.futures import ThreadPoolExecutor
+import time
+from pandera.polars import Check, Column, DataFrameSchema
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from google.colab import files
-import random
 from faker import Faker
 
 # Initialize Faker for realistic data generation
@@ -28,138 +29,220 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The format string above uses none of the thread/process fields, so skip
+# their per-record lookups
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 # Configuration dictionary for maintainability
 CONFIG = {
     'API_URL': 'https://fakestoreapi.com/products',
-    'OUTPUT_PATH': 'business_data_for_powerbi.csv',
+    'OUTPUT_PATH': 'business_data_for_powerbi.parquet',
+    'CSV_OUTPUT_PATH': 'business_data_for_powerbi.csv',
+    'WRITE_CSV': False,  # legacy CSV output alongside Parquet
     'USER_AGENT': 'BusinessPipeline/1.0 (recruiter@example.com)'
 }
 
-# Data validation schemas for quality assurance
+# Shared HTTP session so the socket and TLS context are reused across
+# retries (and future endpoints) instead of re-handshaking per request
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': CONFIG['USER_AGENT'],
+    # ask for compressed payloads explicitly; urllib3 inflates on the C path
+    # and response.content hands the decoded bytes straight to orjson
+    'Accept-Encoding': 'gzip, deflate'
+})
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+
+# FakeStoreAPI returns a stable payload shape; declaring it up front lets
+# from_dicts skip type inference and materialize only the fields we use
+API_PRODUCT_SCHEMA = {
+    'id': pl.Int64,
+    'title': pl.Utf8,
+    'price': pl.Float64,
+    'category': pl.Categorical
+}
+
+# Data validation schemas for quality assurance; the polars backend runs
+# checks as native expressions on the Arrow buffers. Failure-case reporting
+# is capped so a badly broken batch cannot balloon the validation report
+N_FAILURE_CASES = 10
+
 product_schema = DataFrameSchema({
-    'product_id': Column(int, Check.ge(1), nullable=False),
-    'product_name': Column(str, Check.str_length(min_value=1), nullable=False),
-    'unit_price': Column(float, Check.gt(0), nullable=False),
-    'product_category': Column(str, Check.str_length(min_value=1), nullable=False),
-    'price_with_tax': Column(float, Check.gt(0), nullable=False)
+    'product_id': Column(pl.Int64, Check.ge(1, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'product_name': Column(pl.Utf8, Check.str_length(min_value=1, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'unit_price': Column(pl.Float64, Check.gt(0, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    # ne('') stands in for str_length on the dictionary-encoded column
+    'product_category': Column(pl.Categorical, Check.ne('', n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'price_with_tax': Column(pl.Float64, Check.gt(0, n_failure_cases=N_FAILURE_CASES), nullable=False)
 })
 
 order_schema = DataFrameSchema({
-    'order_id': Column(int, Check.ge(100), nullable=False),
-    'customer_name': Column(str, Check.str_length(min_value=1), nullable=False),
-    'order_amount': Column(float, Check.gt(0), nullable=False),
-    'order_date': Column(pa.DateTime, Check(lambda x: x <= pd.Timestamp.now()), nullable=False),
-    'total_order_value': Column(float, Check.gt(0), nullable=False)
+    'order_id': Column(pl.Int64, Check.ge(100, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'customer_name': Column(pl.Utf8, Check.str_length(min_value=1, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'order_amount': Column(pl.Float64, Check.gt(0, n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'order_date': Column(pl.Date, Check.le(datetime.now().date(), n_failure_cases=N_FAILURE_CASES), nullable=False),
+    'total_order_value': Column(pl.Float64, Check.gt(0, n_failure_cases=N_FAILURE_CASES), nullable=False)
 })
 
 # Step 1: Extract Data
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 def extract_from_api():
     """Extract e-commerce product data from FakeStoreAPI."""
     logger.info("Initiating API data extraction")
-    try:
-        headers = {'User-Agent': CONFIG['USER_AGENT']}
-        response = requests.get(CONFIG['API_URL'], headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        df = pd.DataFrame(data)
-        logger.info(f"Successfully extracted {len(df)} product records from API")
-        return df
-    except requests.exceptions.RequestException as e:
-        logger.error(f"API extraction failed: {e}")
-        raise
+    # Three attempts with exponential backoff, capped at 10s between tries
+    for attempt in range(3):
+        try:
+            response = SESSION.get(CONFIG['API_URL'], timeout=10)
+            response.raise_for_status()
+            # orjson parses the raw bytes far faster than stdlib json, and
+            # pl.from_dicts builds columnar Arrow buffers in a single pass
+            data = orjson.loads(response.content)
+            lf = pl.from_dicts(data, schema=API_PRODUCT_SCHEMA).lazy()
+            logger.info("Successfully extracted %d product records from API", len(data))
+            return lf
+        except requests.exceptions.RequestException as e:
+            logger.error("API extraction failed: %s", e)
+            if attempt == 2:
+                raise
+            time.sleep(min(10, 4 * 2 ** attempt))
 
 def extract_from_csv():
     """Extract simulated customer order data from a CSV file."""
     logger.info("Initiating CSV data extraction")
     try:
-        # Generate 50 orders with realistic data
-        sample_data = {
-            'order_id': list(range(101, 151)),
-            'customer_name': [faker.name() for _ in range(50)],
-            'order_amount': [round(random.uniform(50.0, 500.0), 2) for _ in range(50)],
-            'order_date': [faker.date_between(start_date='-1y', end_date='today').strftime('%Y-%m-%d') for _ in range(50)]
-        }
-        sample_df = pd.DataFrame(sample_data)
-        sample_df.to_csv('sample_orders.csv', index=False)
-        df = pd.read_csv('sample_orders.csv')
-        logger.info(f"Successfully extracted {len(df)} order records from CSV")
-        return df
+        # Generate 50 orders with realistic data, vectorized where possible
+        n = 50
+        rng = np.random.default_rng()
+        # datetime64 dates map straight onto a Polars Date column, so the
+        # order_date column never needs string parsing downstream
+        order_dates = (
+            np.datetime64(datetime.now().date())
+            - rng.integers(0, 365, n).astype('timedelta64[D]')
+        )
+        sample_df = pl.DataFrame({
+            'order_id': np.arange(101, 101 + n),
+            'customer_name': [faker.name() for _ in range(n)],  # Faker has no batch API
+            'order_amount': np.round(rng.uniform(50.0, 500.0, n), 2),
+            'order_date': order_dates
+        })
+        # Persist the audit copy in the background; the frame itself never
+        # round-trips through CSV serialization and re-parsing
+        ThreadPoolExecutor(max_workers=1).submit(sample_df.write_csv, 'sample_orders.csv')
+        logger.info("Successfully extracted %d order records from CSV", len(sample_df))
+        # Return the eager frame: its Arrow buffers pickle cleanly across the
+        # process boundary, and transform_data re-enters lazy mode via .lazy()
+        return sample_df
     except Exception as e:
-        logger.error(f"CSV extraction failed: {e}")
+        logger.error("CSV extraction failed: %s", e)
         raise
 
 # Step 2: Transform Data
-def transform_data(api_df, csv_df):
-    """Transform and integrate product and order data for reporting."""
+def transform_data(api_lf, csv_df):
+    """Transform and integrate product and order data as a single lazy query."""
     logger.info("Initiating data transformation")
     try:
-        # Transform API data (products)
-        if not api_df.empty:
-            api_df = api_df[['id', 'title', 'price', 'category']].copy()
-            api_df.rename(columns={
+        # One load timestamp for the whole run, broadcast as a literal
+        now = datetime.now()
+
+        # Transform API data (products) with Polars expressions
+        products = (
+            api_lf
+            .select(['id', 'title', 'price', 'category'])
+            .rename({
                 'id': 'product_id',
                 'title': 'product_name',
                 'price': 'unit_price',
                 'category': 'product_category'
-            }, inplace=True)
-            api_df['source'] = 'API'
-            api_df['load_timestamp'] = datetime.now()
-            api_df['price_with_tax'] = api_df['unit_price'] * 1.10
-            product_schema.validate(api_df, lazy=True)
-            logger.info("Product data validated successfully")
-        else:
-            logger.warning("No API data available for transformation")
+            })
+            .with_columns([
+                (pl.col('unit_price') * 1.10).alias('price_with_tax'),
+                pl.lit('API').cast(pl.Categorical).alias('source'),
+                pl.lit(now).alias('load_timestamp')
+            ])
+        )
 
         # Transform CSV data (orders)
-        if not csv_df.empty:
-            csv_df = csv_df[['order_id', 'customer_name', 'order_amount', 'order_date']].copy()
-            csv_df['source'] = 'CSV'
-            csv_df['load_timestamp'] = datetime.now()
-            csv_df['order_date'] = pd.to_datetime(csv_df['order_date'])
-            csv_df['order_year'] = csv_df['order_date'].dt.year
-            logger.info("Order data prepared")
-        else:
-            logger.warning("No CSV data available for transformation")
-
-        # Simulate product-order relationship (for demo purposes)
-        if not csv_df.empty and not api_df.empty:
-            csv_df['product_id'] = api_df['product_id'].iloc[0]  # Assign first product
-            combined_df = pd.merge(
-                csv_df,
-                api_df[['product_id', 'product_name', 'unit_price', 'product_category', 'price_with_tax']],
-                on='product_id',
-                how='left'
-            )
-            combined_df['total_order_value'] = combined_df['order_amount'] + combined_df['price_with_tax']
-            combined_df.fillna({
-                'product_name': 'Unknown',
-                'unit_price': 0,
-                'product_category': 'N/A',
-                'price_with_tax': 0
-            }, inplace=True)
-            order_schema.validate(combined_df, lazy=True)
-            logger.info("Combined data validated successfully")
-        else:
-            combined_df = pd.DataFrame()
+        orders = (
+            csv_df.lazy()
+            .select(['order_id', 'customer_name', 'order_amount', 'order_date'])
+            .with_columns([
+                pl.col('order_date').dt.year().alias('order_year'),
+                pl.lit('CSV').cast(pl.Categorical).alias('source'),
+                pl.lit(now).alias('load_timestamp')
+            ])
+        )
+
+        # Materialize and validate the full products frame before the demo
+        # broadcast, so every extracted product is checked rather than only
+        # the row that reaches the combined output
+        products_df = products.collect()
+        if products_df.is_empty():
+            logger.warning("No data combined due to empty input")
+            return pl.DataFrame()
+        product_schema.validate(products_df, lazy=True)
+        logger.info("Product data validated successfully")
+
+        # Simulate product-order relationship (for demo purposes): every order
+        # references the first product, so broadcast its columns as literals
+        # instead of paying for a hash join against a single row
+        first_product = products_df.row(0, named=True)
+
+        # Materialize the fused order/enrichment plan
+        combined = (
+            orders
+            .with_columns([
+                pl.lit(first_product['product_id'], dtype=pl.Int64).alias('product_id'),
+                pl.lit(first_product['product_name']).alias('product_name'),
+                pl.lit(first_product['unit_price']).alias('unit_price'),
+                pl.lit(first_product['product_category']).cast(pl.Categorical).alias('product_category'),
+                pl.lit(first_product['price_with_tax']).alias('price_with_tax')
+            ])
+            .with_columns((pl.col('order_amount') + pl.col('price_with_tax')).alias('total_order_value'))
+            # one with_columns call so all defaults run in a single parallel
+            # traversal; a no-op for the broadcast literals, but it keeps
+            # unmatched rows well-defined once a real left join returns
+            .with_columns([
+                pl.col('product_name').fill_null('Unknown'),
+                pl.col('product_category').fill_null('N/A'),
+                pl.col('unit_price').fill_null(0.0),
+                pl.col('price_with_tax').fill_null(0.0)
+            ])
+            .collect(engine='streaming')
+        )
+
+        if combined.is_empty():
             logger.warning("No data combined due to empty input")
+            return pl.DataFrame()
+
+        # Validate on the collected frame: data-level checks need materialized
+        # values (on a LazyFrame pandera would only check the schema). The
+        # product columns are broadcast from an already-validated row, so only
+        # the order-side columns need checking here
+        order_schema.validate(combined, lazy=True)
+        logger.info("Combined data validated successfully")
 
-        return combined_df
+        return combined
     except Exception as e:
-        logger.error(f"Data transformation failed: {e}")
+        logger.error("Data transformation failed: %s", e)
         raise
 
 # Step 3: Load Data
-def load_to_csv(df):
-    """Save transformed data to a CSV file for Power BI reporting."""
+def load_data(df):
+    """Save transformed data to Parquet (and optionally CSV) for Power BI reporting."""
     logger.info("Initiating data loading")
     try:
         output_path = CONFIG['OUTPUT_PATH']
-        df.to_csv(output_path, index=False)
-        logger.info(f"Data successfully saved to {output_path}")
+        df.write_parquet(output_path, compression='zstd', compression_level=3)
+        logger.info("Data successfully saved to %s", output_path)
         files.download(output_path)
+        if CONFIG['WRITE_CSV']:
+            csv_path = CONFIG['CSV_OUTPUT_PATH']
+            df.write_csv(csv_path)
+            logger.info("Legacy CSV copy saved to %s", csv_path)
+            files.download(csv_path)
     except Exception as e:
-        logger.error(f"Data loading failed: {e}")
+        logger.error("Data loading failed: %s", e)
         raise
 
 # Main Pipeline
@@ -167,30 +250,30 @@ def run_pipeline():
     """Execute the end-to-end data pipeline with parallel extraction."""
     logger.info("Starting data pipeline execution")
     try:
-        # Parallel extraction
-        with ThreadPoolExecutor() as executor:
-            api_future = executor.submit(extract_from_api)
-            csv_future = executor.submit(extract_from_csv)
+        # Parallel extraction: threads suit the I/O-bound API call, while the
+        # GIL-bound Faker generation runs in its own process for real
+        # parallelism. Submit the process-pool job first: the worker is forked
+        # at submit time, and forking before the API thread starts means the
+        # child can never inherit a logging lock held mid-record by that thread
+        with ProcessPoolExecutor(max_workers=1) as cpu_pool, ThreadPoolExecutor() as io_pool:
+            csv_future = cpu_pool.submit(extract_from_csv)
+            api_future = io_pool.submit(extract_from_api)
             api_data = api_future.result()
             csv_data = csv_future.result()
 
         # Transform
-        if not api_data.empty or not csv_data.empty:
-            transformed_data = transform_data(api_data, csv_data)
-        else:
-            logger.error("No data extracted; pipeline aborted")
-            return
+        transformed_data = transform_data(api_data, csv_data)
 
         # Load
-        if not transformed_data.empty:
-            load_to_csv(transformed_data)
+        if not transformed_data.is_empty():
+            load_data(transformed_data)
         else:
             logger.error("No data to load; pipeline aborted")
             return
 
         logger.info("Data pipeline completed successfully")
     except Exception as e:
-        logger.error(f"Pipeline execution failed: {e}")
+        logger.error("Pipeline execution failed: %s", e)
         raise
 
 # Execute pipeline
@@ -202,19 +285,19 @@ if __name__ == "__main__":
 # Business Data Pipeline
 
 ## Overview
-This Python script implements a robust end-to-end data pipeline for extracting, transforming, and loading (ETL) business data to support reporting. It integrates e-commerce product data from a public API with a simulated dataset of 50 customer orders, processes the data with rigorous validation, and produces a CSV output optimized for Power BI business intelligence reporting.
+This Python script implements a robust end-to-end data pipeline for extracting, transforming, and loading (ETL) business data to support reporting. It integrates e-commerce product data from a public API with a simulated dataset of 50 customer orders, processes the data with rigorous validation, and produces a Parquet output optimized for Power BI business intelligence reporting.
 
 ## Features
 - **Extraction**: Retrieves product data from FakeStoreAPI and 50 customer orders from a generated CSV, using parallel processing for efficiency.
 - **Transformation**: Cleans, enriches, and merges datasets, incorporating derived metrics such as price with tax and total order value.
 - **Validation**: Applies schema-based data quality checks to ensure data integrity.
-- **Loading**: Generates a Power BI-compatible CSV file, downloadable directly from Google Colab.
+- **Loading**: Generates a Power BI-compatible Parquet file (with an optional legacy CSV copy), downloadable directly from Google Colab.
 - **Observability**: Implements structured logging for execution tracking and diagnostics.
 - **Reliability**: Features API retry logic and comprehensive error handling for robust operation.
 
 ## Prerequisites
 - **Environment**: Google Colab (cloud-based Python notebook).
-- **Dependencies**: Automatically installed (`requests`, `pandas`, `pandera`, `tenacity`, `faker`).
+- **Dependencies**: Automatically installed (`requests`, `pandera[polars]`, `polars`, `numpy`, `orjson`, `faker`).
 - **Internet**: Required for API connectivity.
 
 ## Usage
@@ -222,8 +305,8 @@ This Python script implements a robust end-to-end data pipeline for extracting,
 2. The pipeline will:
    - Extract product data from FakeStoreAPI and 50 simulated orders from a CSV.
    - Transform and validate the combined dataset.
-   - Save the output as `business_data_for_powerbi.csv` and download it automatically.
-3. Import the CSV into Power BI to create visualizations, such as sales by product category or order trends.
+   - Save the output as `business_data_for_powerbi.parquet` and download it automatically.
+3. Import the Parquet file into Power BI to create visualizations, such as sales by product category or order trends.
 4. Download `pipeline.log` from Colab for execution details or troubleshooting.
 
 ## Data Sources
@@ -231,7 +314,7 @@ This Python script implements a robust end-to-end data pipeline for extracting,
 - **Sample CSV**: A programmatically generated dataset containing 50 customer orders with fields for order ID, customer name, order amount, and order date.
 
 ## Output
-The pipeline produces `business_data_for_powerbi.csv` with the following columns:
+The pipeline produces `business_data_for_powerbi.parquet` (set `CONFIG['WRITE_CSV']` for a CSV copy) with the following columns:
 - Order details: `order_id`, `customer_name`, `order_amount`, `order_date`, `order_year`.
 - Product details: `product_id`, `product_name`, `unit_price`, `product_category`, `price_with_tax`.
 - Derived metrics: `total_order_value`.
@@ -241,7 +324,7 @@ The pipeline produces `business_data_for_powerbi.csv` with the following columns
 - **Error Handling**: Robust try-except blocks and logging ensure operational stability.
 - **Retries**: API requests include up to three retries with exponential backoff for reliability.
 - **Validation**: Pandera schemas enforce data quality, checking for valid IDs, positive values, and date ranges.
-- **Performance**: Parallel extraction via ThreadPoolExecutor optimizes runtime.
+- **Performance**: Extraction overlaps the API call (thread) with order generation (worker process).
 - **Configuration**: Centralized settings enhance maintainability.
 
 ## Customization
@@ -249,11 +332,11 @@ To extend for production use:
 - **API**: Update `CONFIG['API_URL']` to a proprietary endpoint with appropriate authentication (e.g., API keys).
 - **Data Source**: Modify `extract_from_csv` to read from Google Drive, a database, or an uploaded file.
 - **Validation**: Adjust schemas to align with specific data requirements.
-- **Output**: Extend `load_to_csv` to support cloud databases (e.g., Google BigQuery) or storage services.
+- **Output**: Extend `load_data` to support cloud databases (e.g., Google BigQuery) or storage services.
 - **Scheduling**: Deploy to a cloud platform (e.g., Google Cloud Functions) with automated triggers.
 
 ## Limitations
-- **Colab Environment**: Outputs (`business_data_for_powerbi.csv`, `pipeline.log`) are stored temporarily and must be downloaded.
+- **Colab Environment**: Outputs (`business_data_for_powerbi.parquet`, `pipeline.log`) are stored temporarily and must be downloaded.
 - **Demo Data**: The CSV is simulated, and the product-order relationship is simplified for demonstration purposes.
 - **Alerting**: Email notifications are not included due to Google Colab’s SMTP constraints.
 